@@ -1,20 +1,59 @@
 from pathlib import Path
-import glob
-from typing import List
+from typing import Any, Dict, Iterable, List
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 
 CONFIG_DIR = Path("/config")
 FALLBACK_CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
 
 
 def list_config_files() -> List[Path]:
-    if CONFIG_DIR.exists():
-        files = sorted(Path(p) for p in glob.glob(str(CONFIG_DIR / "*.y*ml")))
-        if files:
-            return files
-
-    if FALLBACK_CONFIG_DIR.exists():
-        files = sorted(Path(p) for p in glob.glob(str(FALLBACK_CONFIG_DIR / "*.y*ml")))
-        if files:
-            return files
+    for d in (CONFIG_DIR, FALLBACK_CONFIG_DIR):
+        if d.exists():
+            files = sorted(d.glob("*.y*ml"))
+            if files:
+                return files
 
     return []
+
+
+def load_yaml(path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+# Keys the core and the Lidarr sidecar index directly; checked up front so a
+# missing one is reported before any ListenBrainz/MusicBrainz requests are made.
+REQUIRED_KEYS = {
+    "listenbrainz": ("username", "user_token"),
+    "lidarr": (
+        "url",
+        "api_key",
+        "root_folder",
+        "quality_profile",
+        "metadata_profile",
+        "monitor_existing",
+        "monitor_new",
+        "search_on_add",
+    ),
+}
+
+
+def missing_config_keys(cfg: Dict[str, Any], sections: Iterable[str]) -> List[str]:
+    """Dotted paths of REQUIRED_KEYS in `sections` that are absent or empty."""
+    missing = []
+    for section in sections:
+        values = cfg.get(section)
+        if not isinstance(values, dict):
+            values = {}
+        missing.extend(
+            f"{section}.{key}"
+            for key in REQUIRED_KEYS[section]
+            if values.get(key) in (None, "")
+        )
+    return missing
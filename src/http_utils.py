@@ -0,0 +1,317 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util import Retry
+from typing import Dict, Any, Optional, Sequence
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback when orjson isn't installed
+    orjson = None
+    import json
+
+def log(msg: str):
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{ts} {msg}", flush=True)
+
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER = 60
+RETRY_AFTER_JITTER = 0.5
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def make_session(pool_connections: int = 4, pool_maxsize: int = 32, max_retries: Retry | int = 0) -> requests.Session:
+    """
+    Build a keep-alive Session so repeated calls to the same host
+    reuse one TCP/TLS connection instead of handshaking per request.
+    Concurrent callers each get their own pooled connection (up to
+    `pool_maxsize` per host), so the thread pools never queue behind one
+    HTTP/1.1 connection. Retries default to off: callers normally go
+    through http_request().
+    """
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries,
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least `interval` seconds apart across all
+    threads sharing the limiter (e.g. MusicBrainz's 1 req/s rule).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a host looks down: after `failure_threshold` consecutive
+    failed calls it opens and rejects calls for `recovery_timeout` seconds,
+    then lets a single trial call through (half-open) to decide whether to
+    close again or stay open.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the trial call still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> bool:
+        """Count a failed call; returns True if this failure opened the breaker."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.OPEN:
+                return False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+def response_json(r: requests.Response) -> Any:
+    """
+    Parse a JSON body straight from the raw bytes, skipping the
+    decode-to-str round trip that Response.json() does.
+    """
+    if orjson is not None:
+        return orjson.loads(r.content)
+    return json.loads(r.content)
+
+
+def response_json_stream(r: requests.Response) -> Any:
+    """
+    Parse a stream=True response read once from the raw socket, so the
+    body isn't also kept on the Response as .content. For large payloads.
+    """
+    r.raw.decode_content = True
+    try:
+        body = r.raw.read()
+    finally:
+        r.close()
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def retry_after_seconds(r: requests.Response) -> Optional[float]:
+    """Retry-After as seconds; the header may be delta-seconds or an HTTP-date."""
+    value = r.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _rate_limit_reset_seconds(r: requests.Response) -> float:
+    """
+    Seconds until the rate-limit window resets. X-RateLimit-Reset-In
+    (ListenBrainz) is a delta; X-RateLimit-Reset (MusicBrainz, and also
+    ListenBrainz) is a Unix epoch timestamp.
+    """
+    try:
+        reset_in = r.headers.get("X-RateLimit-Reset-In")
+        if reset_in is not None:
+            return max(0.0, float(reset_in))
+        reset_at = r.headers.get("X-RateLimit-Reset")
+        if reset_at is not None:
+            return max(0.0, float(reset_at) - time.time())
+    except ValueError:
+        pass
+    return 1.0
+
+
+def throttle_from_headers(r: requests.Response, label: str = "HTTP"):
+    """
+    Pause when the server reports its rate-limit budget is nearly spent,
+    rather than sleeping unconditionally between calls.
+    """
+    remaining = r.headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return
+
+    try:
+        if int(remaining) >= 2:
+            return
+    except ValueError:
+        return
+
+    wait = retry_after_seconds(r)
+    if wait is None:
+        wait = _rate_limit_reset_seconds(r)
+
+    wait = min(wait, MAX_RETRY_AFTER)
+    log(f"{label} rate limit nearly reached, sleeping {wait:.1f}s...")
+    time.sleep(wait)
+
+
+def _request_not_sent(e: requests.exceptions.RequestException) -> bool:
+    """True if the error happened before the request reached the server."""
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(e, requests.exceptions.ConnectionError):
+        reason = getattr(e.args[0] if e.args else None, "reason", None)
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+def backoff_delay(attempt: int, schedule: Optional[Sequence[float]] = None) -> float:
+    """
+    Delay before retry number `attempt` (1-based) when the server gave no
+    Retry-After: the fixed schedule if one is given, else jittered exponential.
+    """
+    if schedule:
+        return schedule[min(attempt, len(schedule)) - 1]
+    return min(MAX_RETRY_AFTER, (2 ** attempt) * 0.5 + random.random())
+
+
+def http_request(
+    session: requests.Session,
+    method: str,
+    url: str,
+    *,
+    headers: Dict[str, str] | None = None,
+    params: Dict[str, Any] | None = None,
+    json: Any = None,
+    timeout: int = 20,
+    stream: bool = False,
+    retries: int = 3,
+    retry_status: Sequence[int] = RETRYABLE_STATUS,
+    schedule: Optional[Sequence[float]] = None,
+    limiter: Optional[RateLimiter] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    label: str = "HTTP",
+    verbose: bool = False,
+) -> requests.Response:
+    """
+    Request with bounded retries on network errors and `retry_status` codes.
+    Non-idempotent methods (POST) only retry network errors that happened
+    before the request was sent, so `retry_status` is their only other retry.
+    Honours Retry-After when present; otherwise falls back to backoff_delay().
+    Non-retryable HTTP errors raise immediately. With a `breaker`, calls are
+    refused (CircuitOpenError) while it is open and exhausted retries count
+    as failures; any HTTP response below the retryable set counts as success.
+    """
+    if breaker and not breaker.allow():
+        raise CircuitOpenError(f"{label} circuit open, skipping: {url}")
+
+    last_error: Exception | None = None
+    delay = 0.0
+
+    for attempt in range(1, retries + 2):
+        if delay > 0:
+            log(f"{label} retry {attempt - 1}, sleeping {delay:.1f}s...")
+            time.sleep(delay)
+
+        if limiter:
+            limiter.wait()
+
+        if verbose:
+            log(f"→ {label} attempt {attempt}: {method} {url}")
+
+        try:
+            r = session.request(method, url, headers=headers, params=params, json=json, timeout=timeout, stream=stream)
+        except requests.exceptions.RequestException as e:
+            last_error = e
+            log(f"⚠ {label} request error: {type(e).__name__}: {e}")
+            # A POST that may have reached the server must not be re-sent
+            if method.upper() not in IDEMPOTENT_METHODS and not _request_not_sent(e):
+                if breaker and breaker.record_failure():
+                    log(f"✗ {label} failing repeatedly, pausing requests for {breaker.recovery_timeout:.0f}s")
+                raise
+            delay = backoff_delay(attempt, schedule)
+            continue
+
+        if r.status_code < 400:
+            if verbose:
+                log(f"{label} success ({r.status_code})")
+            throttle_from_headers(r, label)
+            if breaker:
+                breaker.record_success()
+            return r
+
+        if r.status_code in retry_status:
+            r.close()  # hand a stream=True connection back to the pool
+            last_error = RuntimeError(f"HTTP {r.status_code}")
+            log(f"✗ {label} HTTP {r.status_code}, will retry")
+            wait = retry_after_seconds(r)
+            if wait is not None:
+                # Jitter so workers told the same Retry-After don't retry in lockstep
+                delay = min(wait, MAX_RETRY_AFTER) + random.uniform(0, RETRY_AFTER_JITTER)
+            else:
+                delay = backoff_delay(attempt, schedule)
+            continue
+
+        log(f"✗ {label} HTTP {r.status_code}, not retryable")
+        if breaker:
+            breaker.record_success()
+        r.raise_for_status()
+
+    if breaker and breaker.record_failure():
+        log(f"✗ {label} failing repeatedly, pausing requests for {breaker.recovery_timeout:.0f}s")
+
+    raise RuntimeError(
+        f"{label} request failed after {retries + 1} attempts: {url}"
+    ) from last_error
+
+
+def http_get(session: requests.Session, url: str, **kwargs) -> requests.Response:
+    return http_request(session, "GET", url, **kwargs)
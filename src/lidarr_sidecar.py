@@ -1,119 +1,241 @@
-import time
-import requests
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 
 from datetime import datetime
 
+from http_utils import http_get, http_request, make_session, response_json, response_json_stream
+
 def log(msg: str):
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"{ts} {msg}", flush=True)
 
+def log_lines(lines):
+    # One write/flush for a block of lines (e.g. the dry-run listing)
+    if not lines:
+        return
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print("\n".join(f"{ts} {line}" for line in lines), flush=True)
+
+_lidarr_session = make_session()
+
+# Lookups/adds in flight at once; Lidarr handles a few concurrent API calls fine
+LIDARR_CONCURRENCY = 4
+
+
 def fmt_sources(sources) -> str:
-    return "+".join(sorted(list(sources))) if sources else "unknown"
+    return "+".join(sorted(sources)) if sources else "unknown"
 
 
-def lidarr_headers(cfg: Dict[str, Any], user_agent: str) -> Dict[str, str]:
+# Built once per key/URL and shared by every call in a run; requests only
+# reads the headers dict, so handing out the same instance is safe.
+@functools.lru_cache(maxsize=8)
+def _lidarr_headers(api_key: str, user_agent: str) -> Dict[str, str]:
     return {
-        "X-Api-Key": cfg["lidarr"]["api_key"],
+        "X-Api-Key": api_key,
         "User-Agent": user_agent,
     }
 
 
+@functools.lru_cache(maxsize=8)
+def _lidarr_api(url: str) -> str:
+    return url.rstrip("/") + "/api/v1"
+
+
+def lidarr_headers(cfg: Dict[str, Any], user_agent: str) -> Dict[str, str]:
+    return _lidarr_headers(cfg["lidarr"]["api_key"], user_agent)
+
+
+def lidarr_api(cfg: Dict[str, Any]) -> str:
+    return _lidarr_api(cfg["lidarr"]["url"])
+
+
 def lidarr_get(cfg: Dict[str, Any], path: str, user_agent: str):
-    r = requests.get(
-        f'{cfg["lidarr"]["url"]}/api/v1/{path}',
+    r = http_get(
+        _lidarr_session,
+        f"{lidarr_api(cfg)}/{path}",
         headers=lidarr_headers(cfg, user_agent),
         timeout=20,
+        label="Lidarr",
+    )
+    return response_json(r)
+
+
+def lidarr_artist_mbids(cfg: Dict[str, Any], user_agent: str) -> set:
+    """MBIDs of every artist in the Lidarr library (streamed: the list can be large)."""
+    r = http_get(
+        _lidarr_session,
+        f"{lidarr_api(cfg)}/artist",
+        headers=lidarr_headers(cfg, user_agent),
+        timeout=60,
+        stream=True,
+        label="Lidarr",
     )
-    r.raise_for_status()
-    return r.json()
+    return {a.get("foreignArtistId") for a in response_json_stream(r)}
 
 
 def lidarr_lookup_artist(cfg: Dict[str, Any], mbid: str, user_agent: str):
-    r = requests.get(
-        f'{cfg["lidarr"]["url"]}/api/v1/artist/lookup',
+    r = http_get(
+        _lidarr_session,
+        f"{lidarr_api(cfg)}/artist/lookup",
         headers=lidarr_headers(cfg, user_agent),
         params={"term": f"mbid:{mbid}"},
         timeout=20,
+        label="Lidarr",
     )
-    r.raise_for_status()
-    data = r.json()
+    data = response_json(r)
     return data[0] if data else None
 
 
+# Profile/tag ids don't change during a process, so resolve them once per
+# Lidarr instance + profile selection rather than on every import.
+_lidarr_ids_cache: Dict[tuple, tuple] = {}
+
+
 def resolve_lidarr_ids(cfg: Dict[str, Any], user_agent: str):
-    qp = lidarr_get(cfg, "qualityprofile", user_agent)
-    mp = lidarr_get(cfg, "metadataprofile", user_agent)
-    tags = lidarr_get(cfg, "tag", user_agent)
+    lidarr = cfg["lidarr"]
+    key = (
+        lidarr["url"],
+        lidarr["api_key"],
+        lidarr["quality_profile"],
+        lidarr["metadata_profile"],
+        tuple(lidarr.get("tags") or ()),
+    )
+    if key in _lidarr_ids_cache:
+        return _lidarr_ids_cache[key]
+
+    qp = {x["name"]: x["id"] for x in lidarr_get(cfg, "qualityprofile", user_agent)}
+    mp = {x["name"]: x["id"] for x in lidarr_get(cfg, "metadataprofile", user_agent)}
+    # No tags configured: skip the /tag round trip entirely
+    wanted_tags = list(dict.fromkeys(lidarr.get("tags") or ()))
+    tags = {t["label"]: t["id"] for t in lidarr_get(cfg, "tag", user_agent)} if wanted_tags else {}
+
+    if lidarr["quality_profile"] not in qp:
+        raise RuntimeError(f"Lidarr quality profile not found: {lidarr['quality_profile']}")
+    if lidarr["metadata_profile"] not in mp:
+        raise RuntimeError(f"Lidarr metadata profile not found: {lidarr['metadata_profile']}")
 
-    qp_id = next(x["id"] for x in qp if x["name"] == cfg["lidarr"]["quality_profile"])
-    mp_id = next(x["id"] for x in mp if x["name"] == cfg["lidarr"]["metadata_profile"])
-    tag_ids = [t["id"] for t in tags if t["label"] in cfg["lidarr"].get("tags", [])]
+    qp_id = qp[lidarr["quality_profile"]]
+    mp_id = mp[lidarr["metadata_profile"]]
+    tag_ids = tuple(tags[label] for label in wanted_tags if label in tags)
 
+    _lidarr_ids_cache[key] = (qp_id, mp_id, tag_ids)
     return qp_id, mp_id, tag_ids
 
 
-def lidarr_add_artist(cfg: Dict[str, Any], artist_obj: Dict[str, Any], qp_id: int, mp_id: int, tag_ids, user_agent: str):
-    payload = {
-        "artistName": artist_obj["artistName"],
-        "foreignArtistId": artist_obj["foreignArtistId"],
+def lidarr_base_payload(cfg: Dict[str, Any], qp_id: int, mp_id: int, tag_ids) -> Dict[str, Any]:
+    """
+    The add-artist fields shared by every artist in a run; built once in
+    lidarr_run_import and merged with each artist's name/MBID.
+    """
+    return {
         "qualityProfileId": qp_id,
         "metadataProfileId": mp_id,
         "rootFolderPath": cfg["lidarr"]["root_folder"],
         "monitored": True,
         "monitorNewItems": cfg["lidarr"]["monitor_new"],
-        "tags": tag_ids,
+        "tags": list(tag_ids),
         "addOptions": {
             "monitor": cfg["lidarr"]["monitor_existing"],
             "searchForMissingAlbums": cfg["lidarr"]["search_on_add"],
         },
     }
 
-    r = requests.post(
-        f'{cfg["lidarr"]["url"]}/api/v1/artist',
+
+def lidarr_add_artist(cfg: Dict[str, Any], artist_obj: Dict[str, Any], base_payload: Dict[str, Any], user_agent: str):
+    payload = {
+        **base_payload,
+        "artistName": artist_obj["artistName"],
+        "foreignArtistId": artist_obj["foreignArtistId"],
+    }
+
+    # Only 429 and failed connects are retried: in both cases the add never
+    # happened, so re-posting cannot create a duplicate.
+    http_request(
+        _lidarr_session,
+        "POST",
+        f"{lidarr_api(cfg)}/artist",
         headers=lidarr_headers(cfg, user_agent),
         json=payload,
         timeout=30,
+        retry_status=(429,),
+        label="Lidarr",
     )
-    r.raise_for_status()
 
 
-def lidarr_run_import(cfg: Dict[str, Any], contract: Dict[str, Any], user_agent: str):
+def lidarr_run_import(cfg: Dict[str, Any], contract: Dict[str, Any], user_agent: str) -> int:
+    """
+    Import the contract's artists into Lidarr (or list them in dry run).
+    Returns the number of artists whose lookup/add failed, so the caller
+    can leave the week unimported and retry it on the next run.
+    """
     dry_run = contract.get("dry_run", True)
     artists = contract.get("artists", {})
 
+    for data in artists.values():
+        data["_src_str"] = fmt_sources(data.get("sources"))
+        data["_src_n"] = len(data.get("sources") or ())
+
     ranked = sorted(
         artists.items(),
-        key=lambda kv: (len(kv[1].get("sources", set())), kv[1].get("name", "")),
-        reverse=True,
+        key=lambda kv: (-kv[1]["_src_n"], kv[1].get("name", "")),
     )
 
     log(f"\nLidarr sidecar — {len(ranked)} artist(s)")
     if dry_run:
         log("DRY RUN — no Lidarr changes will be made\n")
-        for i, (mbid, data) in enumerate(ranked, 1):
-            log(f"{i:>3}. {data['name']}  [{fmt_sources(data.get('sources'))}]")
-        return
+        log_lines([
+            f"{i:>3}. {data['name']}  [{data['_src_str']}]"
+            for i, (mbid, data) in enumerate(ranked, 1)
+        ])
+        return 0
 
     log("\nLIVE MODE — importing into Lidarr\n")
 
     qp_id, mp_id, tag_ids = resolve_lidarr_ids(cfg, user_agent)
-
-    for mbid, data in ranked:
-        src = fmt_sources(data.get("sources"))
-        lookup = lidarr_lookup_artist(cfg, mbid, user_agent)
-
-        if lookup and lookup.get("id"):
-            log(f"SKIP ✓ {data['name']}  [{src}]")
-            continue
-
-        if not lookup:
-            log(f"SKIP ⚠ {data['name']}  [{src}] (lookup returned nothing)")
-            continue
-
-        log(f"ADD  + {data['name']}  [{src}]")
-        lidarr_add_artist(cfg, lookup, qp_id, mp_id, tag_ids, user_agent)
-        time.sleep(0.3)
-
-    log("\n✓ Lidarr import complete.\n")
+    base_payload = lidarr_base_payload(cfg, qp_id, mp_id, tag_ids)
+
+    # One library fetch instead of a lookup per artist just to spot existing ones
+    existing = lidarr_artist_mbids(cfg, user_agent)
+
+    def import_one(item):
+        # Errors are returned, not raised: one failed artist must not stop
+        # the log while the pool carries on adding the rest.
+        mbid, _ = item
+        if mbid in existing:
+            return "exists", None
+
+        try:
+            lookup = lidarr_lookup_artist(cfg, mbid, user_agent)
+            if not lookup:
+                return "missing", None
+            if lookup.get("id"):
+                return "exists", None
+
+            lidarr_add_artist(cfg, lookup, base_payload, user_agent)
+        except Exception as e:
+            return "failed", f"{type(e).__name__}: {e}"
+        return "added", None
+
+    # Artists are independent; results come back in rank order for the log
+    failed = 0
+    with ThreadPoolExecutor(max_workers=LIDARR_CONCURRENCY) as ex:
+        for (mbid, data), (status, error) in zip(ranked, ex.map(import_one, ranked)):
+            src = data["_src_str"]
+            if status == "exists":
+                log(f"SKIP ✓ {data['name']}  [{src}]")
+            elif status == "missing":
+                log(f"SKIP ⚠ {data['name']}  [{src}] (lookup returned nothing)")
+            elif status == "failed":
+                failed += 1
+                log(f"FAIL ✗ {data['name']}  [{src}] ({error})")
+            else:
+                log(f"ADD  + {data['name']}  [{src}]")
+
+    if failed:
+        log(f"\n⚠ Lidarr import complete, {failed} artist(s) failed.\n")
+    else:
+        log("\n✓ Lidarr import complete.\n")
+
+    return failed
@@ -1,8 +1,15 @@
+import sqlite3
 import time
-import requests
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Dict, Any, Iterator, List, Optional
 
-from datetime import datetime
+from datetime import datetime, timezone
+
+from http_utils import CircuitBreaker, RateLimiter, http_get, make_session, response_json
+from state import STATE_FILE
 
 def log(msg: str):
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -12,6 +19,19 @@ LB_CF_RECORDING = "https://api.listenbrainz.org/1/cf/recommendation/user"
 LB_CREATED_FOR = "https://api.listenbrainz.org/1/user/{user}/playlists/createdfor"
 LB_PLAYLIST = "https://api.listenbrainz.org/1/playlist"
 
+# createdfor returns newest first; LB only keeps the last few weeks of
+# generated playlists, so one page covers every Weekly Exploration.
+LB_CREATED_FOR_COUNT = 25
+
+_lb_session = make_session()
+_mb_session = make_session()
+
+# musicbrainz.org allows 1 req/s per client; self-hosted mirrors are unthrottled
+_mb_limiter = RateLimiter(1.0)
+
+# One breaker per MB base URL: an outage fails the remaining lookups fast
+_mb_breakers: Dict[str, CircuitBreaker] = {}
+
 # ------------------------------------------------------------
 # ListenBrainz retry / backoff handling
 # ------------------------------------------------------------
@@ -34,55 +54,20 @@ def lb_get_with_backoff(
 ):
     """
     Perform a GET request to ListenBrainz with a slow, bounded backoff.
-    Retries on network errors and retryable HTTP status codes.
+    Retries on network errors and retryable HTTP status codes, preferring
+    the server's Retry-After over LB_BACKOFF_SCHEDULE when one is sent.
     """
-    last_error: Exception | None = None
-    attempts = [0] + LB_BACKOFF_SCHEDULE
-
-    for attempt, delay in enumerate(attempts, start=1):
-        if delay > 0:
-            log(f"ListenBrainz retry {attempt - 1}, sleeping {delay}s...")
-            time.sleep(delay)
-
-        log(f"→ ListenBrainz attempt {attempt}: GET {url}")
-
-        try:
-            r = requests.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=timeout,
-            )
-
-            # Success
-            if r.status_code < 400:
-                log(f"ListenBrainz success ({r.status_code})")
-                return r
-
-            if r.status_code in (429, 500, 502, 503, 504):
-                last_error = RuntimeError(f"HTTP {r.status_code}")
-                log(f"✗ ListenBrainz HTTP {r.status_code}, will retry")
-                continue
-
-            log(f"✗ ListenBrainz HTTP {r.status_code}, not retryable")
-            r.raise_for_status()
-
-
-        except requests.exceptions.HTTPError as e:
-            status = e.response.status_code if e.response else "unknown"
-            log(f"✗ ListenBrainz HTTP {status}, not retryable")
-            raise
-
-        except requests.exceptions.RequestException as e:
-            last_error = e
-            log(f"⚠ ListenBrainz request error: {type(e).__name__}: {e}")
-            continue
-
-
-    raise RuntimeError(
-        f"ListenBrainz request failed after {len(LB_BACKOFF_SCHEDULE) + 1} attempts: {url}"
-    ) from last_error
-
+    return http_get(
+        _lb_session,
+        url,
+        headers=headers,
+        params=params,
+        timeout=timeout,
+        retries=len(LB_BACKOFF_SCHEDULE),
+        schedule=LB_BACKOFF_SCHEDULE,
+        label="ListenBrainz",
+        verbose=True,
+    )
 
 
 def lb_headers(token: str, user_agent: str) -> Dict[str, str]:
@@ -96,6 +81,37 @@ def parse_lb_date(date_str: str) -> datetime:
     return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
 
 
+def _dates_sort_as_text(dates: List[str]) -> bool:
+    """
+    True if plain string order is chronological order: every non-empty date
+    parses, has the same length and the same UTC suffix (+00:00 or Z).
+    Empty dates sort oldest either way.
+    """
+    dates = [d for d in dates if d]
+    if not dates:
+        return True
+
+    suffix = "Z" if dates[0].endswith("Z") else "+00:00"
+    if any(len(d) != len(dates[0]) or not d.endswith(suffix) for d in dates):
+        return False
+
+    try:
+        for d in dates:
+            parse_lb_date(d)
+    except ValueError:
+        return False
+    return True
+
+
+def _lb_date_key(date_str: str) -> datetime:
+    try:
+        dt = parse_lb_date(date_str)
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    # Naive values are taken as UTC so they compare with aware ones
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
 def lb_get_weekly_exploration_playlists(cfg: Dict[str, Any], user_agent: str) -> List[Dict[str, str]]:
     """
     Returns list of weekly-exploration playlists sorted newest->oldest:
@@ -107,20 +123,26 @@ def lb_get_weekly_exploration_playlists(cfg: Dict[str, Any], user_agent: str) ->
     r = lb_get_with_backoff(
         LB_CREATED_FOR.format(user=user),
         headers=lb_headers(token, user_agent),
+        params={"count": LB_CREATED_FOR_COUNT},
         timeout=20,
     )
 
     r.raise_for_status()
 
-    playlists = r.json().get("playlists", [])
+    playlists = response_json(r).get("playlists", [])
     weekly = []
 
     for p in playlists:
         playlist = p.get("playlist", {})
-        jspf = playlist.get("extension", {}).get("https://musicbrainz.org/doc/jspf#playlist", {})
-        algo = jspf.get("additional_metadata", {}).get("algorithm_metadata", {})
-
-        if algo.get("source_patch") == "weekly-exploration":
+        source_patch = (
+            playlist.get("extension", {})
+            .get("https://musicbrainz.org/doc/jspf#playlist", {})
+            .get("additional_metadata", {})
+            .get("algorithm_metadata", {})
+            .get("source_patch")
+        )
+
+        if source_patch == "weekly-exploration":
             mbid = playlist.get("identifier", "").split("/")[-1]
             weekly.append({
                 "mbid": mbid,
@@ -128,7 +150,12 @@ def lb_get_weekly_exploration_playlists(cfg: Dict[str, Any], user_agent: str) ->
                 "date": playlist.get("date", ""),
             })
 
-    weekly.sort(key=lambda x: parse_lb_date(x["date"]), reverse=True)
+    # LB dates are uniform ISO-8601 UTC strings, so they normally sort
+    # chronologically as text; anything else is sorted by parsed datetime.
+    if _dates_sort_as_text([w["date"] for w in weekly]):
+        weekly.sort(key=itemgetter("date"), reverse=True)
+    else:
+        weekly.sort(key=lambda w: _lb_date_key(w["date"]), reverse=True)
     return weekly
 
 
@@ -140,19 +167,21 @@ def lb_get_playlist(cfg: Dict[str, Any], playlist_mbid: str, user_agent: str) ->
         headers=lb_headers(token, user_agent),
         timeout=20,
     )
-    return r.json().get("playlist", {})
-
-
-def lb_extract_artists_from_playlist(playlist: Dict[str, Any], source: str) -> List[Dict[str, str]]:
-    artists = []
-    for track in playlist.get("track", []):
-        meta = track.get("extension", {}).get("https://musicbrainz.org/doc/jspf#track", {})
-        for a in meta.get("additional_metadata", {}).get("artists", []):
-            mbid = a.get("artist_mbid")
-            name = a.get("artist_credit_name")
-            if mbid and name:
-                artists.append({"mbid": mbid, "name": name, "source": source})
-    return artists
+    return response_json(r).get("playlist", {})
+
+
+def lb_extract_artists_from_playlist(playlist: Dict[str, Any], source: str) -> Iterator[Dict[str, str]]:
+    # Lazy: callers fold these straight into the artist pool, so only one
+    # per-track entry exists at a time rather than the whole playlist's worth
+    return (
+        {"mbid": a["artist_mbid"], "name": a["artist_credit_name"], "source": source}
+        for track in playlist.get("track", ())
+        for a in track.get("extension", {})
+            .get("https://musicbrainz.org/doc/jspf#track", {})
+            .get("additional_metadata", {})
+            .get("artists", ())
+        if a.get("artist_mbid") and a.get("artist_credit_name")
+    )
 
 
 def lb_extract_tracks_from_playlist(playlist: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -170,15 +199,14 @@ def lb_extract_tracks_from_playlist(playlist: Dict[str, Any]) -> List[Dict[str,
         title = t.get("title")
         duration_ms = t.get("duration")
 
+        idents = meta.get("identifier")
         recording_mbid = None
-        for ident in meta.get("identifier", []) if isinstance(meta.get("identifier"), list) else []:
+        for ident in idents if isinstance(idents, list) else ():
             if "musicbrainz.org/recording/" in ident:
-                recording_mbid = ident.split("/")[-1]
+                recording_mbid = ident.rpartition("/")[2]
+                break
 
-        artist_mbids = []
-        for a in add.get("artists", []):
-            if a.get("artist_mbid"):
-                artist_mbids.append(a["artist_mbid"])
+        artist_mbids = [a["artist_mbid"] for a in add.get("artists", ()) if a.get("artist_mbid")]
 
         out.append({
             "title": title,
@@ -197,30 +225,186 @@ def mb_base(cfg: Dict[str, Any]) -> str:
     return f"{base}/ws/2"
 
 
-def get_primary_artist_from_recording(cfg: Dict[str, Any], recording_mbid: str, user_agent: str, retries: int = 3) -> Optional[Dict[str, str]]:
-    url = f"{mb_base(cfg)}/recording/{recording_mbid}"
+@dataclass(frozen=True)
+class MBEndpoint:
+    """MusicBrainz URL prefix, rate limiter and concurrency for one config, resolved once per run."""
+    recording: str
+    limiter: Optional[RateLimiter]
+    breaker: CircuitBreaker
+    concurrency: int
 
-    for attempt in range(1, retries + 1):
-        try:
-            r = requests.get(
-                url,
-                params={"inc": "artist-credits", "fmt": "json"},
-                headers={"User-Agent": user_agent},
-                timeout=10,
-            )
-            r.raise_for_status()
-            data = r.json()
 
-            if not data.get("artist-credit"):
-                return None
+def mb_endpoint(cfg: Dict[str, Any]) -> MBEndpoint:
+    base = mb_base(cfg)
+    return MBEndpoint(
+        recording=f"{base}/recording",
+        limiter=_mb_limiter if "musicbrainz.org" in base else None,
+        breaker=_mb_breakers.setdefault(base, CircuitBreaker()),
+        concurrency=max(1, int(cfg.get("musicbrainz", {}).get("concurrency", MB_CONCURRENCY))),
+    )
+
+
+def get_primary_artist_from_recording(cfg: Dict[str, Any], recording_mbid: str, user_agent: str, retries: int = 3, endpoint: Optional[MBEndpoint] = None) -> Optional[Dict[str, str]]:
+    ep = endpoint or mb_endpoint(cfg)
+
+    try:
+        r = http_get(
+            _mb_session,
+            f"{ep.recording}/{recording_mbid}",
+            params={"inc": "artist-credits", "fmt": "json"},
+            headers={"User-Agent": user_agent},
+            timeout=10,
+            retries=retries - 1,
+            limiter=ep.limiter,
+            breaker=ep.breaker,
+            label="MusicBrainz",
+        )
+        data = response_json(r)
+    except Exception:
+        return None
+
+    if not data.get("artist-credit"):
+        return None
+
+    artist = data["artist-credit"][0]["artist"]
+    return {"name": artist["name"], "mbid": artist["id"]}
+
+
+# MB search returns at most 100 results per page, so one request covers a
+# full CF response (count=100); the rid: query stays well under URL limits.
+MB_SEARCH_BATCH = 100
+
+# Default requests in flight at once (musicbrainz.concurrency). Against
+# musicbrainz.org the limiter still spaces their starts, so this only overlaps
+# each request's latency; self-hosted mirrors have no limiter and scale with it.
+MB_CONCURRENCY = 4
+
+
+def _mb_search_batch(ep: MBEndpoint, recording_mbids: List[str], user_agent: str) -> Dict[str, Dict[str, str]]:
+    out: Dict[str, Dict[str, str]] = {}
+
+    try:
+        r = http_get(
+            _mb_session,
+            ep.recording,
+            params={
+                "query": "rid:(" + " OR ".join(recording_mbids) + ")",
+                "fmt": "json",
+                "limit": MB_SEARCH_BATCH,
+            },
+            headers={"User-Agent": user_agent},
+            timeout=20,
+            retries=1,  # anything still missing falls back to single lookups
+            limiter=ep.limiter,
+            breaker=ep.breaker,
+            label="MusicBrainz",
+        )
+
+        for rec in response_json(r).get("recordings", []):
+            credit = rec.get("artist-credit")
+            if rec.get("id") in recording_mbids and credit:
+                artist = credit[0]["artist"]
+                out[rec["id"]] = {"name": artist["name"], "mbid": artist["id"]}
+
+    except Exception as e:
+        log(f"⚠ MusicBrainz batch lookup failed: {type(e).__name__}: {e}")
+
+    return out
+
+
+# ------------------------------------------------------------
+# MusicBrainz recording → artist cache
+# ------------------------------------------------------------
 
-            artist = data["artist-credit"][0]["artist"]
-            return {"name": artist["name"], "mbid": artist["id"]}
+# CF recommendations overlap heavily week to week, so resolved artists are
+# kept in SQLite next to the state file for a week. Only the main thread
+# touches the cache (before and after the lookup pool); any SQLite error
+# just means a cold lookup.
 
-        except Exception:
-            time.sleep(0.5)
+MB_CACHE_FILE = STATE_FILE.parent / "mb_cache.sqlite"
+MB_CACHE_TTL = 7 * 86400
+MB_CACHE_QUERY_BATCH = 500
 
-    return None
+
+def _mb_cache_connect() -> sqlite3.Connection:
+    MB_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(MB_CACHE_FILE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS recording_artist ("
+        "mbid TEXT PRIMARY KEY, name TEXT NOT NULL, artist_mbid TEXT NOT NULL, fetched_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def _mb_cache_get(recording_mbids: List[str]) -> Dict[str, Dict[str, str]]:
+    out: Dict[str, Dict[str, str]] = {}
+    cutoff = time.time() - MB_CACHE_TTL
+    try:
+        with closing(_mb_cache_connect()) as conn:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(recording_mbids), MB_CACHE_QUERY_BATCH):
+                chunk = recording_mbids[i:i + MB_CACHE_QUERY_BATCH]
+                rows = conn.execute(
+                    "SELECT mbid, name, artist_mbid FROM recording_artist "
+                    f"WHERE fetched_at >= ? AND mbid IN ({','.join('?' * len(chunk))})",
+                    (cutoff, *chunk),
+                )
+                out.update((rec, {"name": name, "mbid": mbid}) for rec, name, mbid in rows)
+    except (sqlite3.Error, OSError) as e:
+        log(f"⚠ MusicBrainz cache unavailable: {e}")
+        return {}
+
+    return out
+
+
+def _mb_cache_put(resolved: Dict[str, Dict[str, str]]):
+    now = time.time()
+    try:
+        with closing(_mb_cache_connect()) as conn, conn:
+            # Expired rows are never read again; drop them so the file stays small
+            conn.execute("DELETE FROM recording_artist WHERE fetched_at < ?", (now - MB_CACHE_TTL,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO recording_artist (mbid, name, artist_mbid, fetched_at) VALUES (?, ?, ?, ?)",
+                [(rec, a["name"], a["mbid"], now) for rec, a in resolved.items()],
+            )
+    except (sqlite3.Error, OSError) as e:
+        log(f"⚠ MusicBrainz cache not updated: {e}")
+
+
+def get_primary_artists_bulk(cfg: Dict[str, Any], recording_mbids: List[str], user_agent: str) -> Dict[str, Dict[str, str]]:
+    """
+    Resolve primary artists for many recordings via the MusicBrainz search
+    endpoint, MB_SEARCH_BATCH recordings per request (paced by the MB limiter):
+      { recording_mbid: { "name": "...", "mbid": "..." }, ... }
+    Recordings missing from the search index fall back to a single lookup;
+    recordings resolved within MB_CACHE_TTL are served from the disk cache.
+    """
+    ep = mb_endpoint(cfg)
+    cached = _mb_cache_get(recording_mbids)
+    todo = [rec for rec in recording_mbids if rec not in cached]
+    out: Dict[str, Dict[str, str]] = {}
+    chunks = [
+        todo[i:i + MB_SEARCH_BATCH]
+        for i in range(0, len(todo), MB_SEARCH_BATCH)
+    ]
+
+    with ThreadPoolExecutor(max_workers=ep.concurrency) as ex:
+        for found in ex.map(lambda chunk: _mb_search_batch(ep, chunk, user_agent), chunks):
+            out.update(found)
+
+        missing = [rec for rec in todo if rec not in out]
+        lookups = ex.map(
+            lambda rec: get_primary_artist_from_recording(cfg, rec, user_agent=user_agent, endpoint=ep),
+            missing,
+        )
+        for rec, a in zip(missing, lookups):
+            if a:
+                out[rec] = a
+
+    _mb_cache_put(out)
+    out.update(cached)
+    return out
 
 
 def lb_get_cf_artists(cfg: Dict[str, Any], user_agent: str) -> List[Dict[str, str]]:
@@ -243,18 +427,29 @@ def lb_get_cf_artists(cfg: Dict[str, Any], user_agent: str) -> List[Dict[str, st
     if not r.text.strip():
         return []
 
-    data = r.json()
+    data = response_json(r)
     payload = data.get("payload", {})
     mbids = payload.get("mbids", [])
 
-    artists: List[Dict[str, str]] = []
+    recordings = [item["recording_mbid"] for item in mbids if item.get("recording_mbid")]
+
+    # Use artist data LB already attached to an item when it names a single
+    # artist (the credit name is then that artist's); the rest go to MB.
+    resolved = {
+        item["recording_mbid"]: {"name": item["artist_credit_name"], "mbid": item["artist_mbids"][0]}
+        for item in mbids
+        if item.get("recording_mbid") and item.get("artist_credit_name") and len(item.get("artist_mbids") or ()) == 1
+    }
 
-    for item in mbids:
-        rec = item.get("recording_mbid")
-        if not rec:
-            continue
+    # A recording can be recommended more than once; look each up only once
+    unresolved = [rec for rec in dict.fromkeys(recordings) if rec not in resolved]
+    if unresolved:
+        resolved.update(get_primary_artists_bulk(cfg, unresolved, user_agent=user_agent))
 
-        a = get_primary_artist_from_recording(cfg, rec, user_agent=user_agent)
+    artists: List[Dict[str, str]] = []
+
+    for rec in recordings:
+        a = resolved.get(rec)
         if a:
             artists.append({
                 "name": a["name"],
@@ -262,6 +457,4 @@ def lb_get_cf_artists(cfg: Dict[str, Any], user_agent: str) -> List[Dict[str, st
                 "source": "collaborative-filtering",
             })
 
-        time.sleep(0.2)
-
     return artists
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 
 import difflib
+import functools
+import json
 import re
 import unicodedata
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from operator import itemgetter
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from datetime import datetime
 
@@ -13,9 +18,31 @@ def log(msg: str):
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"{ts} {msg}", flush=True)
 
-import requests
+from http_utils import http_get, http_request, make_session
+from state import STATE_FILE
+
+try:
+    from lxml import etree as ET
+except ImportError:  # stdlib parser, same findall/attrib API
+    import xml.etree.ElementTree as ET
+
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:  # pure-Python fallback, same 0..1 ratio scale
+    Indel = None
 
 DEFAULT_THRESHOLD = 0.72
+DEFAULT_CONCURRENCY = 8
+RETENTION_DELETE_WORKERS = 4
+
+# Album fallback limits: compilation-style names match huge album sets, so
+# they are skipped outright, and only the closest few albums are expanded.
+GENERIC_ALBUM_TOKENS = frozenset({"various", "artists", "va", "soundtrack", "ost", "single"})
+ALBUM_FALLBACK_LIMIT = 5
+ALBUM_MIN_JACCARD = 0.3
+
+_plex_session = make_session()
+_plex_session.headers.update({"Accept": "application/xml"})
 
 
 # ------------------------------------------------------------
@@ -23,118 +50,279 @@ DEFAULT_THRESHOLD = 0.72
 # ------------------------------------------------------------
 
 APOS = {"’": "'", "‘": "'", "`": "'", "ʼ": "'"}
-SEP_RE = re.compile(r"[\/\-\–\—&:,;+]+")
+APOS_TABLE = str.maketrans(APOS)
+# Separators (/ - – — & : , ; +) are a subset of this class, so one pass covers both
 NONWORD_RE = re.compile(r"[^\w\s']+")
+WS_RE = re.compile(r"\s+")
 
 def norm(s: str) -> str:
     if not s:
         return ""
-    s = unicodedata.normalize("NFKC", s)
-    for k, v in APOS.items():
-        s = s.replace(k, v)
-    s = s.casefold()
-    s = SEP_RE.sub(" ", s)
+    s = unicodedata.normalize("NFKC", s).translate(APOS_TABLE).casefold()
     s = NONWORD_RE.sub(" ", s)
-    return re.sub(r"\s+", " ", s).strip()
-
-def jaccard(a: str, b: str) -> float:
-    sa, sb = set(norm(a).split()), set(norm(b).split())
-    return len(sa & sb) / len(sa | sb) if sa and sb else 0.0
-
-def seq(a: str, b: str) -> float:
-    return difflib.SequenceMatcher(None, norm(a), norm(b)).ratio()
+    return WS_RE.sub(" ", s).strip()
+
+def _jaccard_tokens(sa: FrozenSet[str], sb: FrozenSet[str]) -> float:
+    if not sa or not sb:
+        return 0.0
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, so only one set is built
+    i = len(sa & sb)
+    return i / (len(sa) + len(sb) - i)
+
+def _seq_norm(na: str, nb: str, sm: Optional[difflib.SequenceMatcher] = None) -> float:
+    if na == nb:
+        return 1.0
+    if Indel is not None:
+        return Indel.normalized_similarity(na, nb)
+    if sm is None:
+        return difflib.SequenceMatcher(None, na, nb, autojunk=False).ratio()
+    # sm already holds na as seq2 (and its b2j index); only swap the candidate
+    sm.set_seq1(nb)
+    return sm.ratio()
+
+def _seq_matcher(n: str) -> Optional[difflib.SequenceMatcher]:
+    if Indel is not None:
+        return None
+    sm = difflib.SequenceMatcher(None, autojunk=False)
+    sm.set_seq2(n)
+    return sm
 
 
 # ------------------------------------------------------------
 # Data
 # ------------------------------------------------------------
 
-@dataclass
+# n_* hold norm() of a field and t_* its token set, computed once per
+# track so _score never re-normalises inside the N×M matching loop.
+# b_* fold the token set into a 64-bit signature (one bit per token hash):
+# a zero AND proves two fields share no tokens without building a set.
+
+@dataclass(slots=True)
 class LBTrack:
     artist: str
     title: str
     album: str
-
-@dataclass
+    n_artist: str = field(init=False, repr=False)
+    n_title: str = field(init=False, repr=False)
+    n_album: str = field(init=False, repr=False)
+    t_artist: FrozenSet[str] = field(init=False, repr=False)
+    t_title: FrozenSet[str] = field(init=False, repr=False)
+    t_album: FrozenSet[str] = field(init=False, repr=False)
+    b_artist: int = field(init=False, repr=False)
+    b_title: int = field(init=False, repr=False)
+    sm_artist: Optional[difflib.SequenceMatcher] = field(init=False, repr=False)
+    sm_title: Optional[difflib.SequenceMatcher] = field(init=False, repr=False)
+    sm_album: Optional[difflib.SequenceMatcher] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.n_artist, self.t_artist = _norm_tokens(self.artist)
+        self.n_title, self.t_title = _norm_tokens(self.title)
+        self.n_album, self.t_album = _norm_tokens(self.album)
+        self.b_artist = _token_bits(self.t_artist)
+        self.b_title = _token_bits(self.t_title)
+        # difflib fallback only: one matcher per field, reused for every candidate
+        self.sm_artist = _seq_matcher(self.n_artist)
+        self.sm_title = _seq_matcher(self.n_title)
+        self.sm_album = _seq_matcher(self.n_album)
+
+@dataclass(frozen=True, slots=True)
 class PlexTrack:
     rk: str
     title: str
     artist: str
     album: str
     original: str
+    n_title: str = field(init=False, repr=False)
+    n_artist: str = field(init=False, repr=False)
+    n_album: str = field(init=False, repr=False)
+    n_original: str = field(init=False, repr=False)
+    t_title: FrozenSet[str] = field(init=False, repr=False)
+    t_artist: FrozenSet[str] = field(init=False, repr=False)
+    t_album: FrozenSet[str] = field(init=False, repr=False)
+    t_original: FrozenSet[str] = field(init=False, repr=False)
+    b_title: int = field(init=False, repr=False)
+    b_artist: int = field(init=False, repr=False)
+    b_original: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # frozen so cached search results can be shared safely between threads
+        for name in ("title", "artist", "album", "original"):
+            n, t = _norm_tokens(getattr(self, name))
+            object.__setattr__(self, f"n_{name}", n)
+            object.__setattr__(self, f"t_{name}", t)
+        for name in ("title", "artist", "original"):
+            object.__setattr__(self, f"b_{name}", _token_bits(getattr(self, f"t_{name}")))
+
+
+# Artist and album strings repeat across most candidates (every track on an
+# album), so memoise per string on top of the per-track fields.
+@functools.lru_cache(maxsize=8192)
+def _norm_tokens(s: str) -> Tuple[str, FrozenSet[str]]:
+    n = norm(s)
+    return n, frozenset(n.split())
+
+def _token_bits(tokens: FrozenSet[str]) -> int:
+    bits = 0
+    for tok in tokens:
+        bits |= 1 << (hash(tok) & 63)
+    return bits
 
 
 # ------------------------------------------------------------
 # Plex API
 # ------------------------------------------------------------
 
-def _plex_xml(base, token, path, params=None):
-    h = {"X-Plex-Token": token, "Accept": "application/xml"}
-    r = requests.get(base.rstrip("/") + path, headers=h, params=params, timeout=30)
-    r.raise_for_status()
-    return ET.fromstring(r.text)
+def _plex_xml(base, token, path, params=None, timeout=30):
+    h = {"X-Plex-Token": token}
+    r = http_get(_plex_session, base.rstrip("/") + path, headers=h, params=params, timeout=timeout, label="Plex")
+    return ET.fromstring(r.content)
 
 def _plex_machine_id(base, token):
     return _plex_xml(base, token, "/identity").attrib["machineIdentifier"]
 
-def _plex_section_id(base, token, name):
+def _plex_section(base, token, name) -> Tuple[str, str]:
+    # (key, updatedAt) from the one /library/sections listing
     root = _plex_xml(base, token, "/library/sections")
     for d in root.findall("Directory"):
         if d.attrib.get("title", "").casefold() == name.casefold():
-            return d.attrib["key"]
+            return d.attrib["key"], d.attrib.get("updatedAt", "")
     raise RuntimeError(f"Plex library not found: {name}")
 
-def _plex_search_track(base, token, sid, q):
-    root = _plex_xml(base, token, f"/library/sections/{sid}/search", {"type": "10", "query": q})
-    out = []
-    for t in root.findall("Track"):
-        out.append(PlexTrack(
+@dataclass(eq=False)
+class PlexClient:
+    """
+    Server-level lookups fetched once per process rather than on every
+    plex_run_playlists call. A section's updatedAt comes from the same
+    listing as its key, so it reflects the library as of this run.
+    """
+    base: str
+    token: str
+    _sections: Dict[str, Tuple[str, str]] = field(default_factory=dict, repr=False)
+
+    @cached_property
+    def machine_id(self) -> str:
+        return _plex_machine_id(self.base, self.token)
+
+    def _section(self, name: str) -> Tuple[str, str]:
+        if name not in self._sections:
+            self._sections[name] = _plex_section(self.base, self.token, name)
+        return self._sections[name]
+
+    def section_id(self, name: str) -> str:
+        return self._section(name)[0]
+
+    def section_updated_at(self, name: str) -> str:
+        return self._section(name)[1]
+
+@functools.lru_cache(maxsize=8)
+def _plex_client(base, token) -> PlexClient:
+    return PlexClient(base, token)
+
+# Search results are cached per run: tracks from the same album or artist
+# repeat the same queries. Callers pass _search_key(q) so case/spacing
+# variants share an entry; plex_run_playlists clears them around matching.
+
+def _search_key(q) -> str:
+    # Plex search is case-insensitive, so this never changes the results
+    return " ".join((q or "").split()).lower()
+
+def _plex_tracks(root) -> Tuple[PlexTrack, ...]:
+    return tuple(
+        PlexTrack(
             rk=t.attrib["ratingKey"],
             title=t.attrib.get("title", ""),
             artist=t.attrib.get("grandparentTitle", ""),
             album=t.attrib.get("parentTitle", ""),
             original=t.attrib.get("originalTitle", ""),
-        ))
-    return out
+        )
+        for t in root.findall("Track")
+    )
 
+@functools.lru_cache(maxsize=2048)
+def _plex_search_track(base, token, sid, q):
+    root = _plex_xml(base, token, f"/library/sections/{sid}/search", {"type": "10", "query": q})
+    return _plex_tracks(root)
+
+@functools.lru_cache(maxsize=2048)
 def _plex_search_album(base, token, sid, q):
     root = _plex_xml(base, token, f"/library/sections/{sid}/search", {"type": "9", "query": q})
-    return [d.attrib["ratingKey"] for d in root.findall("Directory")]
+    return tuple((d.attrib["ratingKey"], d.attrib.get("title", "")) for d in root.findall("Directory"))
 
+@functools.lru_cache(maxsize=2048)
 def _plex_album_tracks(base, token, rk):
     root = _plex_xml(base, token, f"/library/metadata/{rk}/children")
-    out = []
-    for t in root.findall("Track"):
-        out.append(PlexTrack(
-            rk=t.attrib["ratingKey"],
-            title=t.attrib.get("title", ""),
-            artist=t.attrib.get("grandparentTitle", ""),
-            album=t.attrib.get("parentTitle", ""),
-            original=t.attrib.get("originalTitle", ""),
-        ))
-    return out
+    return _plex_tracks(root)
 
-def _plex_playlists(base, token):
-    root = _plex_xml(base, token, "/playlists")
+def _plex_all_tracks(base, token, sid):
+    root = _plex_xml(base, token, f"/library/sections/{sid}/all", {"type": "10"}, timeout=300)
+    return _plex_tracks(root)
 
-    out = []
+def _plex_clear_caches():
+    _plex_search_track.cache_clear()
+    _plex_search_album.cache_clear()
+    _plex_album_tracks.cache_clear()
 
-    for p in root.findall("Playlist"):
-        out.append({
-            "ratingKey": p.attrib.get("ratingKey"),
-            "title": p.attrib.get("title", ""),
-            "addedAt": int(p.attrib.get("addedAt", "0")),
-        })
+def _playlist_entry(p):
+    return {
+        "ratingKey": p.get("ratingKey"),
+        "title": p.get("title", ""),
+        "addedAt": int(p.get("addedAt", "0")),
+    }
 
-    return out
+
+def _plex_playlists(base, token):
+    """
+    Yield the server's audio playlists, streaming the XML so video/photo
+    playlists are never held in memory.
+    """
+    r = http_get(
+        _plex_session,
+        base.rstrip("/") + "/playlists",
+        headers={"X-Plex-Token": token},
+        params={"playlistType": "audio"},
+        timeout=30,
+        stream=True,
+        label="Plex",
+    )
+    r.raw.decode_content = True
+
+    try:
+        for _, elem in ET.iterparse(r.raw, events=("end",)):
+            if elem.tag != "Playlist":
+                continue
+            # Older servers ignore the playlistType filter
+            if elem.get("playlistType", "audio") == "audio":
+                yield _playlist_entry(elem)
+            elem.clear()
+    finally:
+        r.close()
+
+
+def _plex_create_playlist(base, token, machine, title, rating_keys):
+    uri = f"server://{machine}/com.plexapp.plugins.library/library/metadata/" + ",".join(rating_keys)
+    # Only 429 and failed connects are retried: anything else may already
+    # have created the playlist
+    http_request(
+        _plex_session,
+        "POST",
+        base.rstrip("/") + "/playlists",
+        headers={"X-Plex-Token": token},
+        params={"type": "audio", "title": title, "smart": "0", "uri": uri},
+        timeout=30,
+        retry_status=(429,),
+        label="Plex",
+    )
 
 
 def _plex_delete_playlist(base, token, rating_key):
-    requests.delete(
+    http_request(
+        _plex_session,
+        "DELETE",
         base.rstrip("/") + f"/playlists/{rating_key}",
         headers={"X-Plex-Token": token},
         timeout=30,
-    ).raise_for_status()
+        label="Plex",
+    )
 
 
 def _playlist_week_sort_key(title):
@@ -149,20 +337,135 @@ def _playlist_week_sort_key(title):
     return (year, week)
 
 
+# ------------------------------------------------------------
+# Library index
+# ------------------------------------------------------------
+
+# Optional (plex.library-index): fetch every track in the section once and
+# match in memory instead of searching per LB track. The track list is
+# cached on disk and only refetched when the section's updatedAt changes.
+
+def _first_token(n: str) -> str:
+    return n.split(" ", 1)[0]
+
+def _plex_index_path(machine, sid):
+    return STATE_FILE.parent / f"plex_index_{machine}_{sid}.json"
+
+def _plex_library_tracks(base, token, machine, sid, updated_at):
+    path = _plex_index_path(machine, sid)
+
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("updatedAt") == updated_at:
+                return [PlexTrack(*row) for row in cached.get("tracks", [])]
+        except (OSError, ValueError, TypeError):
+            pass
+
+    log("→ Plex: fetching full library track list...")
+    tracks = _plex_all_tracks(base, token, sid)
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "updatedAt": updated_at,
+                "tracks": [[t.rk, t.title, t.artist, t.album, t.original] for t in tracks],
+            }, f)
+    except OSError as e:
+        log(f"⚠ Plex: library index not cached: {e}")
+
+    return tracks
+
+def _build_index(tracks) -> Dict[str, List[PlexTrack]]:
+    index = defaultdict(list)
+    for t in tracks:
+        index[_first_token(t.n_title)].append(t)
+    return index
+
+
 # ------------------------------------------------------------
 # Matching
 # ------------------------------------------------------------
 
-def _score(lb: LBTrack, p: PlexTrack) -> float:
-    title = 0.6 * jaccard(lb.title, p.title) + 0.4 * seq(lb.title, p.title)
+def _score(lb: LBTrack, p: PlexTrack, threshold: float = DEFAULT_THRESHOLD) -> float:
+    jt = _jaccard_tokens(lb.t_title, p.t_title) if lb.b_title & p.b_title else 0.0
+    ja = _jaccard_tokens(lb.t_artist, p.t_artist) if lb.b_artist & p.b_artist else 0.0
+    jo = _jaccard_tokens(lb.t_artist, p.t_original) if lb.b_artist & p.b_original else 0.0
+
+    # Best case with every seq() == 1 and a perfect album: candidates that
+    # can't reach the threshold skip the costlier similarity calls.
+    upper = 0.5 * (0.6 * jt + 0.4) + 0.35 * (0.6 * max(ja, jo) + 0.4) + 0.15
+    if upper < threshold:
+        return 0.0
+
+    # Tighten the bound as each real component replaces its best case
+    title = 0.6 * jt + 0.4 * _seq_norm(lb.n_title, p.n_title, lb.sm_title)
+    if 0.5 * title + 0.35 * (0.6 * max(ja, jo) + 0.4) + 0.15 < threshold:
+        return 0.0
+
     artist = max(
-        0.6 * jaccard(lb.artist, p.artist) + 0.4 * seq(lb.artist, p.artist),
-        0.6 * jaccard(lb.artist, p.original) + 0.4 * seq(lb.artist, p.original),
+        0.6 * ja + 0.4 * _seq_norm(lb.n_artist, p.n_artist, lb.sm_artist),
+        0.6 * jo + 0.4 * _seq_norm(lb.n_artist, p.n_original, lb.sm_artist),
     )
-    album = 0.6 * jaccard(lb.album, p.album) + 0.4 * seq(lb.album, p.album)
+    if 0.5 * title + 0.35 * artist + 0.15 < threshold:
+        return 0.0
+
+    album = 0.6 * _jaccard_tokens(lb.t_album, p.t_album) + 0.4 * _seq_norm(lb.n_album, p.n_album, lb.sm_album)
     return 0.5 * title + 0.35 * artist + 0.15 * album
 
 
+def _is_exact(lb: LBTrack, p: PlexTrack) -> bool:
+    # Same normalised title, artist and album (when LB has one): no need to
+    # score the remaining candidates. A title/artist hit on another album
+    # (compilation, live copy) is scored normally so the right album can win.
+    return (
+        bool(lb.n_title and lb.n_artist)
+        and lb.n_title == p.n_title
+        and lb.n_artist in (p.n_artist, p.n_original)
+        and (not lb.n_album or lb.n_album == p.n_album)
+    )
+
+
+def _best_candidate(lb: LBTrack, candidates, best=None, score=0.0) -> Tuple[Optional[PlexTrack], float]:
+    """
+    Argmax of _score over candidates, seeded with the best found so far.
+    An exact match scores 1.0 and ends the scan.
+    """
+    for h in candidates:
+        if _is_exact(lb, h):
+            return h, 1.0
+        s = _score(lb, h)
+        if s > score:
+            best, score = h, s
+    return best, score
+
+
+def _best_match_for_track(base, token, sid, t: LBTrack, index=None) -> Tuple[Optional[PlexTrack], float]:
+    best, score = None, 0.0
+    if index is not None:
+        best, score = _best_candidate(t, index.get(_first_token(t.n_title), ()))
+
+    # Fall back to Plex search when the index has no match (or is disabled)
+    if score < DEFAULT_THRESHOLD:
+        hits = _plex_search_track(base, token, sid, _search_key(t.title))
+        best, score = _best_candidate(t, hits, best, score)
+
+    if score < DEFAULT_THRESHOLD and not t.t_album <= GENERIC_ALBUM_TOKENS:
+        albums = _plex_search_album(base, token, sid, _search_key(t.album))[:ALBUM_FALLBACK_LIMIT]
+        for ar, album_title in albums:
+            if _jaccard_tokens(t.t_album, _norm_tokens(album_title)[1]) < ALBUM_MIN_JACCARD:
+                continue
+            best, score = _best_candidate(t, _plex_album_tracks(base, token, ar), best, score)
+            # Keep comparing albums unless this one held the exact track:
+            # a deluxe/compilation copy can clear the threshold first
+            if score >= 1.0:
+                break
+
+    return best, score
+
+
 # ------------------------------------------------------------
 # Entry point
 # ------------------------------------------------------------
@@ -186,67 +489,81 @@ def plex_run_playlists(cfg: Dict, contract: Dict, user_agent: str = "") -> None:
         log("✗ Plex config incomplete.")
         return
 
-    machine = _plex_machine_id(base, token)
-    section = _plex_section_id(base, token, library)
+    if user_agent:
+        _plex_session.headers["User-Agent"] = user_agent
 
-    today = datetime.now().strftime("%d/%m")
-    title = f"{prefix} {today}"
+    _plex_clear_caches()
 
-    tracks = [
-        LBTrack(
-            artist=t.get("artist", ""),
-            title=t.get("title", ""),
-            album=t.get("album", ""),
-        )
-        for t in weekly["tracks"]
-    ]
-    matched = []
+    # The two lookups are independent (and open the first connections to
+    # the server), so run them alongside building the LB tracks.
+    client = _plex_client(base, token)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        machine_f = ex.submit(lambda: client.machine_id)
+        section_f = ex.submit(client.section_id, library)
+
+        today = datetime.now().strftime("%d/%m")
+        title = f"{prefix} {today}"
+
+        tracks = [
+            LBTrack(
+                artist=t.get("artist", ""),
+                title=t.get("title", ""),
+                album=t.get("album", ""),
+            )
+            for t in weekly["tracks"]
+        ]
+
+        machine = machine_f.result()
+        section = section_f.result()
+
+    index = None
+    if plex.get("library-index"):
+        updated_at = client.section_updated_at(library)
+        index = _build_index(_plex_library_tracks(base, token, machine, section, updated_at))
 
     log(f"→ Creating Plex playlist: {title}")
-    for t in tracks:
-        best, score = None, 0.0
-        for h in _plex_search_track(base, token, section, t.title):
-            s = _score(t, h)
-            if s > score:
-                best, score = h, s
-
-        if not best or score < DEFAULT_THRESHOLD:
-            for ar in _plex_search_album(base, token, section, t.album):
-                for h in _plex_album_tracks(base, token, ar):
-                    s = _score(t, h)
-                    if s > score:
-                        best, score = h, s
+    workers = max(1, int(plex.get("concurrency", DEFAULT_CONCURRENCY)))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(lambda t: _best_match_for_track(base, token, section, t, index), tracks))
+
+    # Search results are only needed for matching; don't hold them across configs
+    _plex_clear_caches()
 
+    # Report in playlist order, after the workers have finished
+    matched = []
+    for t, (best, score) in zip(tracks, results):
         if best and score >= DEFAULT_THRESHOLD:
             matched.append(best.rk)
+        else:
+            log(f"  ✗ No Plex match: {t.artist} - {t.title}")
+
+    log(f"→ Plex: matched {len(matched)}/{len(tracks)} track(s)")
 
     if not matched:
         log("✗ Plex: no matched tracks.")
         return
 
-    uri = f"server://{machine}/com.plexapp.plugins.library/library/metadata/" + ",".join(matched)
-    requests.post(
-        base.rstrip("/") + "/playlists",
-        headers={"X-Plex-Token": token},
-        params={"type": "audio", "title": title, "smart": "0", "uri": uri},
-        timeout=30,
-    ).raise_for_status()
+    _plex_create_playlist(base, token, machine, title, matched)
 
     log(f"✓ Plex playlist created: {title}")
 
-
+    # Listed once, after the create, so the new playlist carries Plex's addedAt
     retention = int(plex.get("pl-retention", 4))
-
-    playlists = _plex_playlists(base, token)
+    _apply_retention(base, token, list(_plex_playlists(base, token)), prefix, retention)
 
 
+def _apply_retention(base, token, playlists, prefix, retention):
+    """
+    Delete all but the newest `retention` playlists whose title starts with
+    `prefix`.
+    """
     scoutarr_playlists = [
         p for p in playlists
         if p["title"].startswith(prefix)
     ]
 
     scoutarr_playlists.sort(
-        key=lambda p: p["addedAt"],
+        key=itemgetter("addedAt"),
         reverse=True
     )
 
@@ -255,10 +572,7 @@ def plex_run_playlists(cfg: Dict, contract: Dict, user_agent: str = "") -> None:
     for p in old:
         log(f"→ Removing old Plex playlist: {p['title']}")
 
-        _plex_delete_playlist(
-            base,
-            token,
-            p["ratingKey"]
-        )
-
-        log(f"✓ Removed: {p['title']}")
+    # Deletes are independent; results come back in order for the log
+    with ThreadPoolExecutor(max_workers=RETENTION_DELETE_WORKERS) as ex:
+        for p, _ in zip(old, ex.map(lambda p: _plex_delete_playlist(base, token, p["ratingKey"]), old)):
+            log(f"✓ Removed: {p['title']}")
@@ -2,11 +2,11 @@
 
 import socket
 socket.has_ipv6 = False
+import re
+from operator import itemgetter
 import sys
-import yaml
-from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-from config_loader import list_config_files
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from config_loader import list_config_files, load_yaml, missing_config_keys
 from state import load_state, save_state
 from listenbrainz_core import (
     lb_get_weekly_exploration_playlists,
@@ -27,20 +27,13 @@ USER_AGENT = "scoutarr.fm/0.6 (christuckey.uk)"
 # Helpers
 # ------------------------------------------------------------
 
-from datetime import datetime
+from datetime import date, datetime
 
 def log(msg: str):
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"{ts} {msg}", flush=True)
 
 
-def load_yaml(path: Path) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
-
-
-
-
 def enabled(cfg: Dict[str, Any], *keys, default=False) -> bool:
     cur = cfg
     for k in keys:
@@ -50,36 +43,48 @@ def enabled(cfg: Dict[str, Any], *keys, default=False) -> bool:
     return bool(cur)
 
 
-def build_week_id_from_title(title: str) -> Optional[str]:
+def merge_artists(pool: Dict[str, Dict[str, Any]], artists: Iterable[Dict[str, str]], source: str) -> None:
     """
-    "Weekly Exploration for user, week of 2026-01-26 Mon"
-    -> "2026-W05"
+    Add `artists` to the contract's artist pool under `source`. Only new
+    MBIDs allocate an entry (setdefault would build a throwaway dict and
+    set for every artist already in the pool).
     """
-    import re
-    from datetime import date
+    for a in artists:
+        entry = pool.get(a["mbid"])
+        if entry is None:
+            pool[a["mbid"]] = {"name": a["name"], "sources": {source}}
+        else:
+            entry["sources"].add(source)
 
-    m = re.search(r"week of (\d{4}-\d{2}-\d{2})", title)
-    if not m:
-        return None
 
-    y, mo, d = map(int, m.group(1).split("-"))
-    iso = date(y, mo, d).isocalendar()
-    return f"{iso.year}-W{iso.week:02d}"
+_WEEK_OF_RE = re.compile(r"week of (\d{4})-(\d{2})-(\d{2})")
 
 
 def week_key_from_title(title: str) -> Optional[Tuple[int, int]]:
-    import re
-    from datetime import date
-
-    m = re.search(r"week of (\d{4}-\d{2}-\d{2})", title)
+    """
+    "Weekly Exploration for user, week of 2026-01-26 Mon"
+    -> (2026, 5)
+    """
+    m = _WEEK_OF_RE.search(title)
     if not m:
         return None
 
-    y, mo, d = map(int, m.group(1).split("-"))
-    iso = date(y, mo, d).isocalendar()
+    iso = date(int(m[1]), int(m[2]), int(m[3])).isocalendar()
     return (iso.year, iso.week)
 
 
+def build_week_id_from_title(title: str) -> Optional[str]:
+    """
+    "Weekly Exploration for user, week of 2026-01-26 Mon"
+    -> "2026-W05"
+    """
+    key = week_key_from_title(title)
+    if not key:
+        return None
+
+    return f"{key[0]}-W{key[1]:02d}"
+
+
 def normalize_playlist_id(identifier: str) -> str:
     return identifier.rstrip("/").split("/")[-1]
 
@@ -118,6 +123,13 @@ def main():
             log("→ Nothing enabled that requires ListenBrainz data.")
             continue
 
+        # Lidarr only reads its settings when it actually imports
+        sections = ["listenbrainz"] + (["lidarr"] if lidarr_enabled and not dry_run else [])
+        missing = missing_config_keys(cfg, sections)
+        if missing:
+            log(f"✗ Config incomplete, skipping: missing {', '.join(missing)}")
+            continue
+
         weekly_list = []
         if weekly_enabled:
             weekly_list = lb_get_weekly_exploration_playlists(cfg, user_agent=USER_AGENT)
@@ -132,7 +144,7 @@ def main():
                 weekly_ranked.append((key, meta.get("date", ""), meta))
 
         weekly_ranked.sort(
-            key=lambda x: (x[0], x[1]),
+            key=itemgetter(0, 1),
             reverse=True
         )
 
@@ -214,17 +226,22 @@ def main():
                 current_meta.get("title", "")
             )
 
+        # Playlists fetched this run, by mbid, shared by both sidecars
+        playlists: Dict[str, Dict[str, Any]] = {}
+
+        def get_playlist(mbid: str) -> Dict[str, Any]:
+            if mbid not in playlists:
+                playlists[mbid] = lb_get_playlist(cfg, mbid, user_agent=USER_AGENT)
+            return playlists[mbid]
+
+        # Only Lidarr consumes the current week (via its artists)
         if (
             current_meta
-            and need_weekly
+            and lidarr_enabled
             and current_week_id not in imported_lidarr_weeks
         ):
 
-            pl = lb_get_playlist(
-                cfg,
-                current_meta["mbid"],
-                user_agent=USER_AGENT
-            )
+            pl = get_playlist(current_meta["mbid"])
 
             week_id = build_week_id_from_title(pl.get("title", ""))
 
@@ -235,29 +252,15 @@ def main():
                 "tracks": lb_extract_tracks_from_playlist(pl),
             }
 
-            artists = lb_extract_artists_from_playlist(
-                pl,
-                source="weekly-exploration"
+            merge_artists(
+                contract["artists"],
+                lb_extract_artists_from_playlist(pl, source="weekly-exploration"),
+                "weekly-exploration",
             )
 
-            for a in artists:
-                entry = contract["artists"].setdefault(
-                    a["mbid"],
-                    {"name": a["name"], "sources": set()}
-                )
-
-                entry["sources"].add("weekly-exploration")
-
             log(f"→ Weekly(current): {pl.get('title')}")
 
         if plex_enabled:
-            current_week_id = None
-
-            if current_meta:
-                current_week_id = build_week_id_from_title(
-                    current_meta.get("title", "")
-                )
-
             for playlist_id, info in playlist_state.items():
 
                 week_id = info.get("week_id")
@@ -273,11 +276,7 @@ def main():
 
                 log(f"→ Creating Plex playlist for archived week: {week_id}")
 
-                pl = lb_get_playlist(
-                    cfg,
-                    playlist_id,
-                    user_agent=USER_AGENT
-                )
+                pl = get_playlist(playlist_id)
 
                 contract["weekly"]["previous"] = {
                     "mbid": playlist_id,
@@ -294,22 +293,23 @@ def main():
 
         if need_cf:
             cf_artists = lb_get_cf_artists(cfg, user_agent=USER_AGENT)
-            for a in cf_artists:
-                entry = contract["artists"].setdefault(
-                    a["mbid"], {"name": a["name"], "sources": set()}
-                )
-                entry["sources"].add("collaborative-filtering")
+            merge_artists(contract["artists"], cf_artists, "collaborative-filtering")
 
             log(f"→ CF artists: {len(cf_artists)}")
 
         if lidarr_enabled and contract["artists"]:
-            lidarr_run_import(cfg, contract, user_agent=USER_AGENT)
-
-            if current_week_id:
-                imported_lidarr_weeks.add(current_week_id)
-
-            if current_meta:
-                playlist_state[current_meta["mbid"]]["imported_to_lidarr"] = True
+            failed = lidarr_run_import(cfg, contract, user_agent=USER_AGENT)
+
+            # Leave the week unimported so the next run retries it; artists
+            # added this time are skipped then as already in Lidarr.
+            if failed:
+                log(f"⚠ Lidarr: {failed} artist(s) failed, week will be retried next run")
+            else:
+                if current_week_id:
+                    imported_lidarr_weeks.add(current_week_id)
+
+                if current_meta:
+                    playlist_state[current_meta["mbid"]]["imported_to_lidarr"] = True
 
         user_state["created_plex_weeks"] = sorted(created_plex_weeks)
 
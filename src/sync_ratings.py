@@ -1,8 +1,5 @@
 #!/usr/bin/env python3
 
-import requests
-import xml.etree.ElementTree as ET
-import yaml
 import time
 import os
 import argparse
@@ -11,11 +8,32 @@ from datetime import datetime
 import logging
 logging.basicConfig(level=logging.INFO)
 
+try:
+    from lxml import etree as ET
+except ImportError:  # stdlib parser, same findall/get API
+    import xml.etree.ElementTree as ET
+
 MB_HEADERS = {
     "User-Agent": "Scoutarr-fm/1.0"
 }
 
-from config_loader import list_config_files
+from config_loader import list_config_files, load_yaml
+from http_utils import RETRYABLE_STATUS, make_session, response_json
+from urllib3.util import Retry
+
+# One keep-alive session for Plex, MusicBrainz and ListenBrainz calls.
+# Transient failures are retried by the adapter with jittered backoff and
+# Retry-After; the last response is returned so status checks still apply.
+# POST is included because the only one here (LB feedback) sets a score.
+_session = make_session(max_retries=Retry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_jitter=1.0,
+    status_forcelist=RETRYABLE_STATUS,
+    allowed_methods=("GET", "POST"),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+))
 
 def get_mb_sleep(mb_url):
     if "musicbrainz.org" in mb_url:
@@ -53,13 +71,13 @@ def fallback_recording_search(mb_url, artist, title):
             "fmt": "json"
         }
 
-        r = requests.get(search_url, params=params, headers=MB_HEADERS, timeout=20)
+        r = _session.get(search_url, params=params, headers=MB_HEADERS, timeout=20)
 
         if r.status_code != 200:
             log(f"  → Search failed ({r.status_code})")
             return None
 
-        data = r.json()
+        data = response_json(r)
         recordings = data.get("recordings", [])
 
         if not recordings:
@@ -70,22 +88,21 @@ def fallback_recording_search(mb_url, artist, title):
                 "fmt": "json"
             }
 
-            r = requests.get(search_url, params=params, headers=MB_HEADERS, timeout=20)
+            r = _session.get(search_url, params=params, headers=MB_HEADERS, timeout=20)
 
             if r.status_code != 200:
                 log(f"  → Relaxed search failed ({r.status_code})")
                 return None
 
-            data = r.json()
+            data = response_json(r)
             recordings = data.get("recordings", [])
 
         if not recordings:
             log("  → No recordings returned")
             return None
 
-        recordings.sort(key=lambda x: x.get("score", 0), reverse=True)
-
-        top = recordings[0]
+        # Only the best candidate is used; max() keeps the first on ties, as the sort did
+        top = max(recordings, key=lambda x: x.get("score", 0))
 
         rec_id = top.get("id")
         rec_title = top.get("title", "")
@@ -114,8 +131,8 @@ def fallback_release_by_title(mb_url, track_mbid, title):
         search_url = f"{mb_url}/ws/2/release"
         params = {"query": title, "fmt": "json"}
 
-        r = requests.get(search_url, params=params, headers=MB_HEADERS, timeout=10)
-        data = r.json()
+        r = _session.get(search_url, params=params, headers=MB_HEADERS, timeout=10)
+        data = response_json(r)
 
         for rel in data.get("releases", []):
             release_id = rel["id"]
@@ -125,7 +142,7 @@ def fallback_release_by_title(mb_url, track_mbid, title):
             rel_url = f"{mb_url}/ws/2/release/{release_id}"
             rel_params = {"inc": "recordings", "fmt": "json"}
 
-            r = requests.get(
+            r = _session.get(
                 rel_url,
                 params=rel_params,
                 headers=MB_HEADERS,
@@ -135,7 +152,7 @@ def fallback_release_by_title(mb_url, track_mbid, title):
             if r.status_code != 200:
                 continue
 
-            rel_data = r.json()
+            rel_data = response_json(r)
 
             for media in rel_data.get("media", []):
                 for track in media.get("tracks", []):
@@ -151,13 +168,13 @@ def fallback_release_by_title(mb_url, track_mbid, title):
 
 def fallback_artist_release_scan(mb_url, track_mbid, artist):
     try:
-        r = requests.get(
+        r = _session.get(
             f"{mb_url}/ws/2/artist",
             params={"query": artist, "fmt": "json"},
             headers=MB_HEADERS,
             timeout=10
         )
-        data = r.json()
+        data = response_json(r)
 
         if not data.get("artists"):
             return None
@@ -165,7 +182,7 @@ def fallback_artist_release_scan(mb_url, track_mbid, artist):
         artist_id = data["artists"][0]["id"]
 
 
-        r = requests.get(
+        r = _session.get(
             f"{mb_url}/ws/2/release",
             params={"artist": artist_id, "fmt": "json"},
             headers=MB_HEADERS,
@@ -175,7 +192,7 @@ def fallback_artist_release_scan(mb_url, track_mbid, artist):
         if r.status_code != 200:
             return None
 
-        data = r.json()
+        data = response_json(r)
 
         for rel in data.get("releases", []):
             release_id = rel["id"]
@@ -185,7 +202,7 @@ def fallback_artist_release_scan(mb_url, track_mbid, artist):
             rel_url = f"{mb_url}/ws/2/release/{release_id}"
             rel_params = {"inc": "recordings", "fmt": "json"}
 
-            r = requests.get(
+            r = _session.get(
                 rel_url,
                 params=rel_params,
                 headers=MB_HEADERS,
@@ -195,7 +212,7 @@ def fallback_artist_release_scan(mb_url, track_mbid, artist):
             if r.status_code != 200:
                 continue
 
-            rel_data = r.json()
+            rel_data = response_json(r)
 
 
             for media in rel_data.get("media", []):
@@ -212,7 +229,7 @@ def fallback_artist_release_scan(mb_url, track_mbid, artist):
 def resolve_recording_from_tid(mb_url, track_mbid):
     try:
         log(f"  [DEBUG] resolve_recording_from_tid: querying tid:{track_mbid}")
-        r = requests.get(
+        r = _session.get(
             f"{mb_url}/ws/2/recording",
             params={
                 "query": f"tid:{track_mbid}",
@@ -226,7 +243,7 @@ def resolve_recording_from_tid(mb_url, track_mbid):
             log(f"  [DEBUG] resolve_recording_from_tid: non-200 status {r.status_code}")
             return None
 
-        data = r.json()
+        data = response_json(r)
         log(f"  [DEBUG] resolve_recording_from_tid: status={r.status_code}, recordings={len(data.get('recordings', []))}")
         recs = data.get("recordings", [])
 
@@ -344,14 +361,14 @@ def process_track(t, score, label, headers, mb_url, username, stats):
         url = f"https://api.listenbrainz.org/1/feedback/user/{username}/get-feedback-for-recordings"
         params = {"recording_mbids": recording_mbid}
 
-        r = requests.get(url, headers=headers, params=params, timeout=10)
+        r = _session.get(url, headers=headers, params=params, timeout=10)
         log(f"  → LB lookup MBID: {recording_mbid}")
 
         if r.status_code != 200:
             log(f"  → ⚠️ Feedback fetch failed ({r.status_code})")
             current_score = 0
         else:
-            data = r.json()
+            data = response_json(r)
             items = data.get("feedback", [])
             current_score = items[0]["score"] if items else 0
 
@@ -382,7 +399,7 @@ def process_track(t, score, label, headers, mb_url, username, stats):
     }
 
     try:
-        r = requests.post(
+        r = _session.post(
             "https://api.listenbrainz.org/1/feedback/recording-feedback",
             headers=headers,
             json=payload,
@@ -410,7 +427,7 @@ def process_track(t, score, label, headers, mb_url, username, stats):
 # -------------------------
 def get_music_section_id(plex_url, plex_token, library_name):
     url = f"{plex_url}/library/sections?X-Plex-Token={plex_token}"
-    r = requests.get(url)
+    r = _session.get(url)
     root = ET.fromstring(r.content)
 
     for directory in root.findall("Directory"):
@@ -425,7 +442,7 @@ def get_music_section_id(plex_url, plex_token, library_name):
 # -------------------------
 def get_tracks(plex_url, plex_token, section_id, rating):
     url = f"{plex_url}/library/sections/{section_id}/all?type=10&userRating={rating}&X-Plex-Token={plex_token}"
-    r = requests.get(url)
+    r = _session.get(url)
     root = ET.fromstring(r.content)
 
     tracks = []
@@ -434,7 +451,7 @@ def get_tracks(plex_url, plex_token, section_id, rating):
         rating_key = track.get("ratingKey")
 
         meta_url = f"{plex_url}/library/metadata/{rating_key}?X-Plex-Token={plex_token}"
-        meta = requests.get(meta_url)
+        meta = _session.get(meta_url)
         meta_root = ET.fromstring(meta.content)
 
         for t in meta_root.findall(".//Track"):
@@ -474,8 +491,7 @@ def send_feedback(tracks, score, label, headers, mb_url, username, stats):
 # Run per config
 # -------------------------
 def run_config(config_path):
-    with open(config_path, "r") as f:
-        config = yaml.safe_load(f)
+    config = load_yaml(config_path)
 
     name = os.path.basename(config_path)
 
@@ -573,8 +589,7 @@ def run_single(track_mbid, score, plex_user, artist, title):
 
     for config_path in configs:
         log(f"[DEBUG] Loading config: {config_path}")
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
+        config = load_yaml(config_path)
 
 
         name = os.path.basename(config_path)